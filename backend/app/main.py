@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.database import create_tables
 from app.routers import alerts
@@ -14,7 +15,8 @@ app = FastAPI(
     description="FastAPI backend for stock alerts with PostgreSQL integration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware for frontend integration
@@ -46,6 +48,5 @@ async def health_check():
     return {"status": "healthy"}
 
 
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+# Development: uvicorn app.main:app --reload
+# Production:  gunicorn -c gunicorn_conf.py app.main:app
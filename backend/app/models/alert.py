@@ -1,13 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Backs GET /api/alerts filtering on symbol, alone or with active status;
+        # symbol leads, so no separate single-column index is needed
+        Index("ix_alerts_symbol_active", "symbol", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String(10), nullable=False, index=True)  # Stock symbol (e.g., AAPL)
+    symbol = Column(String(10), nullable=False)  # Stock symbol (e.g., AAPL)
     alert_type = Column(String(50), nullable=False)  # price, volume, news, etc.
     condition = Column(String(20), nullable=False)  # above, below, equals
     threshold_value = Column(Float)  # Price or volume threshold
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List
@@ -11,7 +12,7 @@ router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
 
 @router.post("/", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
-async def create_alert(
+def create_alert(
     alert_data: AlertCreate,
     db: Session = Depends(get_db)
 ):
@@ -34,7 +35,6 @@ async def create_alert(
         # Add to database
         db.add(db_alert)
         db.commit()
-        db.refresh(db_alert)
         
         return db_alert
         
@@ -53,7 +53,7 @@ async def create_alert(
 
 
 @router.get("/", response_model=AlertListResponse)
-async def get_alerts(
+def get_alerts(
     skip: int = 0,
     limit: int = 100,
     symbol: str = None,
@@ -63,19 +63,30 @@ async def get_alerts(
     """
     Retrieve alerts with optional filtering.
     """
-    query = db.query(Alert)
+    filters = []
     
     # Apply filters
     if symbol:
-        query = query.filter(Alert.symbol == symbol.upper())
+        filters.append(Alert.symbol == symbol.upper())
     if is_active is not None:
-        query = query.filter(Alert.is_active == is_active)
+        filters.append(Alert.is_active == is_active)
     
-    # Get total count
-    total = query.count()
+    # Apply pagination, counting the full filtered set in the same round trip
+    rows = db.execute(
+        select(Alert, func.count().over().label("total"))
+        .where(*filters)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    alerts = [row.Alert for row in rows]
     
-    # Apply pagination
-    alerts = query.offset(skip).limit(limit).all()
+    if rows:
+        total = rows[0].total
+    elif skip > 0 or limit <= 0:
+        # An empty page carries no window count; fall back to counting
+        total = db.scalar(select(func.count()).select_from(Alert).where(*filters))
+    else:
+        total = 0
     
     return AlertListResponse(
         alerts=alerts,
@@ -86,11 +97,11 @@ async def get_alerts(
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
-async def get_alert(alert_id: int, db: Session = Depends(get_db)):
+def get_alert(alert_id: int, db: Session = Depends(get_db)):
     """
     Get a specific alert by ID.
     """
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,7 +111,7 @@ async def get_alert(alert_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{alert_id}", response_model=AlertResponse)
-async def update_alert(
+def update_alert(
     alert_id: int,
     alert_data: AlertUpdate,
     db: Session = Depends(get_db)
@@ -108,7 +119,7 @@ async def update_alert(
     """
     Update an existing alert.
     """
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -125,7 +136,8 @@ async def update_alert(
     
     try:
         db.commit()
-        db.refresh(alert)
+        # updated_at is set by the database; load just that column while the session is open
+        db.refresh(alert, ["updated_at"])
         return alert
     except Exception as e:
         db.rollback()
@@ -136,17 +148,16 @@ async def update_alert(
 
 
 @router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_alert(alert_id: int, db: Session = Depends(get_db)):
+def delete_alert(alert_id: int, db: Session = Depends(get_db)):
     """
     Delete an alert.
     """
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
-    if not alert:
+    result = db.execute(delete(Alert).where(Alert.id == alert_id))
+    db.commit()
+    
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alert not found"
         )
-    
-    db.delete(alert)
-    db.commit()
     return None
\ No newline at end of file
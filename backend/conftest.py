@@ -0,0 +1,145 @@
+"""
+Shared pytest fixtures for the backend test suite.
+
+The application's engine, schema and TestClient are shared by the whole test session.
+Each test runs inside an outer transaction that is rolled back on teardown, and
+commits made by the application only release a SAVEPOINT, so tests stay isolated
+without rebuilding the schema.
+"""
+
+import os
+
+# Tests never inherit DATABASE_URL, so they cannot touch a real database by accident.
+# Another throwaway database can be opted into with TEST_DATABASE_URL.
+# Must be set before the app is imported.
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.database import engine as app_engine, get_db, Base
+
+
+# Listeners go on the application's own engine, and must be registered before
+# app.main is imported because that import already opens a connection.
+if app_engine.dialect.name == "sqlite":
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+    @event.listens_for(app_engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    # Test data is throwaway, so skip journaling and syncing work on every commit
+    @event.listens_for(app_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+        cursor.close()
+
+    @event.listens_for(app_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+from app.main import app  # noqa: E402
+from app.models.alert import Alert  # noqa: E402
+
+
+def seed_alerts(db, rows) -> list[Alert]:
+    """Bulk insert alert dicts in one statement and return the created rows, ids included."""
+    rows = list(rows)
+    # An empty parameter list would execute a single INSERT of all-default values
+    if not rows:
+        return []
+    return db.scalars(
+        insert(Alert).returning(Alert, sort_by_parameter_order=True),
+        rows
+    ).all()
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The application's engine, with all tables created."""
+    Base.metadata.create_all(bind=app_engine)
+    return app_engine
+
+
+@pytest.fixture(scope="session")
+def session_client():
+    """TestClient whose application lifespan runs once per session."""
+    # FastAPI caches the schema on app.openapi_schema; build it up front
+    app.openapi()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def openapi_schema(session_client):
+    """The /openapi.json document, fetched once per session."""
+    response = session_client.get("/openapi.json")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _savepoint_session(connection) -> Session:
+    """Session on the test connection whose commits only release a SAVEPOINT."""
+    return Session(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    )
+
+
+@pytest.fixture
+def db_connection(engine):
+    """Connection holding an outer transaction that is rolled back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    yield connection
+
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db_session(db_connection):
+    """Database session for test setup and checks, sharing the per-test transaction."""
+    session = _savepoint_session(db_connection)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(session_client, db_connection):
+    """Test client whose requests each get a fresh session on the per-test connection."""
+    # A new session per request, as in production, so reads after a write hit the
+    # database rather than an identity map shared with the previous request
+    def override_get_db():
+        session = _savepoint_session(db_connection)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield session_client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def alert_seed_rows():
+    """Rows for seeded_alerts; test modules override or parametrize this fixture."""
+    return ()
+
+
+@pytest.fixture
+def seeded_alerts(db_session, alert_seed_rows) -> list[Alert]:
+    """alert_seed_rows inserted into the per-test session."""
+    return seed_alerts(db_session, alert_seed_rows)
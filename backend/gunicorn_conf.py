@@ -0,0 +1,32 @@
+"""
+Gunicorn configuration for production deployments.
+
+Usage:
+    gunicorn -c gunicorn_conf.py app.main:app
+
+Each worker is a separate process running its own uvicorn event loop, so
+requests are served on every available core. Override the worker count
+with WEB_CONCURRENCY (e.g. 1 under Kubernetes, where replicas scale out
+instead and the orchestrator should see worker crashes directly).
+"""
+
+import os
+
+bind = os.getenv("BIND", f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+keepalive = 30
+timeout = 60
+graceful_timeout = 30
+
+# Import the app once in the master, so create_tables() runs a single time
+# instead of racing CREATE TABLE/INDEX from every worker on a fresh database
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; each worker opens its own"""
+    from app.database import engine
+
+    engine.dispose(close=False)
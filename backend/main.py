@@ -1,7 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import httpx
+import orjson
+from cachetools import TTLCache
+import redis.asyncio as redis
+from redis.exceptions import RedisError
 import asyncio
+from functools import lru_cache
+import hashlib
+import re
+import time
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime, timedelta
@@ -10,7 +19,21 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Stock AI Agent - PE Ratio API", version="1.0.0")
+# Configuration, read once at import so the request path never touches the environment
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+ALPHA_VANTAGE_BASE_URL = "https://www.alphavantage.co"
+CACHE_EXPIRY = int(os.getenv("CACHE_EXPIRY", "3600"))  # 1 hour in seconds
+# Upper bound on concurrent upstream lookups across all batch requests
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "3"))
+# "memory" keeps the cache per process; "redis" shares it between workers
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+app = FastAPI(
+    title="Stock AI Agent - PE Ratio API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # Configure CORS for frontend integration
 app.add_middleware(
@@ -41,78 +64,144 @@ class StockInfoResponse(BaseModel):
     error: Optional[str] = None
 
 # In-memory cache for demo purposes (in production, use Redis)
-pe_ratio_cache = {}
-CACHE_EXPIRY = 3600  # 1 hour in seconds
+CACHE_MAX_SYMBOLS = 10_000
+# Bounded LRU with per-entry expiry, so memory stays flat however many symbols are requested
+pe_ratio_cache = TTLCache(maxsize=CACHE_MAX_SYMBOLS, ttl=CACHE_EXPIRY, timer=time.monotonic)
+
+MAX_BATCH_SYMBOLS = 10
+# Whole comma-separated symbol list, bounded to MAX_BATCH_SYMBOLS entries
+_SYMBOL_LIST_RE = re.compile(
+    r"\s*[A-Za-z0-9.\-]{1,10}\s*(?:,\s*[A-Za-z0-9.\-]{1,10}\s*){0,%d}" % (MAX_BATCH_SYMBOLS - 1)
+)
+
+# Placeholders Alpha Vantage uses for missing numeric fields
+_MISSING_VALUES = frozenset((None, "None", "-", "N/A", ""))
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    """Convert an Alpha Vantage numeric field, which uses placeholder strings for missing data"""
+    return None if value in _MISSING_VALUES else float(value)
 
 class PERatioService:
-    def __init__(self):
-        self.api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-        if not self.api_key:
+    def __init__(self, client: httpx.AsyncClient, redis_client: Optional[redis.Redis] = None):
+        if not ALPHA_VANTAGE_API_KEY:
             raise RuntimeError("Environment variable 'ALPHA_VANTAGE_API_KEY' must be set.")
-        self.base_url = "https://www.alphavantage.co/query"
+        # Pooled HTTP client shared with the rest of the application
+        self.client = client
+        # Cache shared between workers; None keeps caching in-process only
+        self.redis = redis_client
+        # Pending upstream fetches, so concurrent misses for one symbol share a single call
+        self._inflight: Dict[str, asyncio.Task] = {}
         
     async def get_company_overview(self, symbol: str) -> Dict[str, Any]:
         """Fetch company overview data from Alpha Vantage API"""
         try:
-            async with httpx.AsyncClient() as client:
-                params = {
-                    "function": "OVERVIEW",
-                    "symbol": symbol,
-                    "apikey": self.api_key
-                }
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                # Handle API errors
-                if "Error Message" in data:
-                    raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
-                
-                if "Note" in data:
-                    raise HTTPException(status_code=429, detail="API rate limit exceeded")
-                
-                return data
+            params = {
+                "function": "OVERVIEW",
+                "symbol": symbol,
+                "apikey": ALPHA_VANTAGE_API_KEY
+            }
+            response = await self.client.get("/query", params=params)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            # Handle API errors
+            if "Error Message" in data:
+                raise HTTPException(status_code=404, detail=f"Symbol {symbol} not found")
+            
+            if "Note" in data:
+                raise HTTPException(status_code=429, detail="API rate limit exceeded")
+            
+            return data
         except httpx.HTTPError as e:
             raise HTTPException(status_code=503, detail=f"External API error: {str(e)}")
 
+    async def _shared_cache_get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Read parsed overview fields from Redis, treating an unreachable server as a miss"""
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(f"pe:{cache_key}")
+        except RedisError:
+            return None
+        if raw is None:
+            return None
+        parsed = orjson.loads(raw)
+        parsed["last_updated"] = datetime.fromisoformat(parsed["last_updated"])
+        return parsed
+
+    async def _shared_cache_set(self, cache_key: str, parsed: Dict[str, Any]) -> None:
+        """Store parsed overview fields in Redis; the in-process cache still holds them if this fails"""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(f"pe:{cache_key}", orjson.dumps(parsed), ex=CACHE_EXPIRY)
+        except RedisError:
+            pass
+
+    async def _get_parsed_overview(self, symbol: str) -> Dict[str, Any]:
+        """Get the parsed overview fields for a symbol, served from cache when fresh"""
+        cache_key = symbol.upper()
+        try:
+            return pe_ratio_cache[cache_key]
+        except KeyError:
+            pass
+        
+        task = self._inflight.get(cache_key)
+        if task is None:
+            # Run the fetch in its own task so it does not belong to any one caller
+            task = asyncio.create_task(self._fetch_parsed_overview(cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._fetch_finished(cache_key, done))
+        
+        # Shield so a cancelled caller, including the first, does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    def _fetch_finished(self, cache_key: str, task: asyncio.Task) -> None:
+        """Forget a completed fetch so the next miss starts a new one"""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_parsed_overview(self, cache_key: str) -> Dict[str, Any]:
+        """Load the parsed overview from the shared cache, or fetch and parse it from upstream"""
+        # Not copied into the local cache: its TTL would restart and outlive the shared entry
+        shared = await self._shared_cache_get(cache_key)
+        if shared is not None:
+            return shared
+        
+        overview_data = await self.get_company_overview(cache_key)
+        
+        parsed = {
+            "pe_ratio": _parse_float(overview_data.get("PERatio")),
+            "price": _parse_float(overview_data.get("AnalystTargetPrice")),
+            "eps": _parse_float(overview_data.get("EPS")),
+            "market_cap": overview_data.get("MarketCapitalization", "N/A"),
+            "company_name": overview_data.get("Name", "Unknown"),
+            "last_updated": datetime.now()
+        }
+        
+        # Cache the parsed fields so every view of this symbol shares one upstream call
+        pe_ratio_cache[cache_key] = parsed
+        await self._shared_cache_set(cache_key, parsed)
+        
+        return parsed
+
     async def get_pe_ratio(self, symbol: str) -> PERatioResponse:
         """Get PE ratio for a stock symbol"""
-        # Check cache first
-        cache_key = f"{symbol.upper()}_pe"
-        if cache_key in pe_ratio_cache:
-            cached_data, timestamp = pe_ratio_cache[cache_key]
-            if datetime.now().timestamp() - timestamp < CACHE_EXPIRY:
-                return cached_data
-        
-        # Fetch fresh data
         try:
-            overview_data = await self.get_company_overview(symbol.upper())
-            
-            # Extract PE ratio and related data
-            pe_ratio = overview_data.get("PERatio", "None")
-            pe_ratio = float(pe_ratio) if pe_ratio != "None" and pe_ratio != "-" else None
-            
-            # Extract other financial data
-            price = overview_data.get("AnalystTargetPrice", "None")
-            price = float(price) if price != "None" and price != "-" else None
+            overview = await self._get_parsed_overview(symbol)
             
-            eps = overview_data.get("EPS", "None")
-            eps = float(eps) if eps != "None" and eps != "-" else None
-            
-            response = PERatioResponse(
+            return PERatioResponse.model_construct(
                 symbol=symbol.upper(),
-                pe_ratio=pe_ratio,
-                price=price,
-                earnings_per_share=eps,
-                last_updated=datetime.now(),
+                pe_ratio=overview["pe_ratio"],
+                price=overview["price"],
+                earnings_per_share=overview["eps"],
+                last_updated=overview["last_updated"],
                 data_source="Alpha Vantage"
             )
             
-            # Cache the result
-            pe_ratio_cache[cache_key] = (response, datetime.now().timestamp())
-            
-            return response
-            
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -121,29 +210,16 @@ class PERatioService:
     async def get_stock_info(self, symbol: str) -> StockInfoResponse:
         """Get comprehensive stock information including PE ratio"""
         try:
-            overview_data = await self.get_company_overview(symbol.upper())
-            
-            # Extract all relevant data
-            pe_ratio = overview_data.get("PERatio", "None")
-            pe_ratio = float(pe_ratio) if pe_ratio != "None" and pe_ratio != "-" else None
-            
-            price = overview_data.get("AnalystTargetPrice", "None")
-            price = float(price) if price != "None" and price != "-" else None
-            
-            eps = overview_data.get("EPS", "None")
-            eps = float(eps) if eps != "None" and eps != "-" else None
+            overview = await self._get_parsed_overview(symbol)
             
-            market_cap = overview_data.get("MarketCapitalization", "N/A")
-            company_name = overview_data.get("Name", "Unknown")
-            
-            return StockInfoResponse(
+            return StockInfoResponse.model_construct(
                 symbol=symbol.upper(),
-                company_name=company_name,
-                pe_ratio=pe_ratio,
-                price=price,
-                earnings_per_share=eps,
-                market_cap=market_cap,
-                last_updated=datetime.now()
+                company_name=overview["company_name"],
+                pe_ratio=overview["pe_ratio"],
+                price=overview["price"],
+                earnings_per_share=overview["eps"],
+                market_cap=overview["market_cap"],
+                last_updated=overview["last_updated"]
             )
             
         except Exception as e:
@@ -151,7 +227,7 @@ class PERatioService:
             if isinstance(e, HTTPException):
                 error_message = e.detail
             
-            return StockInfoResponse(
+            return StockInfoResponse.model_construct(
                 symbol=symbol.upper(),
                 company_name=None,
                 pe_ratio=None,
@@ -162,8 +238,48 @@ class PERatioService:
                 error=error_message
             )
 
-# Initialize service
-pe_service = PERatioService()
+@lru_cache(maxsize=1)
+def get_pe_service() -> PERatioService:
+    """Dependency returning the single PERatioService, bound to the shared HTTP and Redis clients"""
+    return PERatioService(app.state.http_client, app.state.redis)
+
+# Registered before open_http_client, which builds the service with this client
+@app.on_event("startup")
+async def open_redis_client():
+    """Connect the shared cache when CACHE_BACKEND=redis, so workers reuse each other's fetches"""
+    app.state.redis = None
+    if CACHE_BACKEND == "redis":
+        app.state.redis = redis.from_url(REDIS_URL, socket_connect_timeout=1, socket_timeout=1)
+
+@app.on_event("startup")
+async def open_http_client():
+    """Create one pooled HTTP client so upstream connections are reused across requests"""
+    app.state.http_client = httpx.AsyncClient(
+        base_url=ALPHA_VANTAGE_BASE_URL,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30),
+        http2=True
+    )
+    # Build the service now so missing configuration fails startup rather than the first request
+    get_pe_service()
+
+@app.on_event("startup")
+async def create_batch_semaphore():
+    """Create the semaphore on the serving loop so every batch request shares it"""
+    app.state.batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    await app.state.http_client.aclose()
+    # Drop the service bound to the closed client; a restarted app builds a new one
+    get_pe_service.cache_clear()
+
+@app.on_event("shutdown")
+async def close_redis_client():
+    """Close the shared cache connection pool, if one was opened"""
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
 
 @app.get("/")
 async def root():
@@ -171,41 +287,111 @@ async def root():
     return {"message": "Stock AI Agent - PE Ratio API", "status": "running"}
 
 @app.get("/pe-ratio/{symbol}", response_model=PERatioResponse)
-async def get_pe_ratio(symbol: str):
+async def get_pe_ratio(
+    symbol: str,
+    request: Request,
+    response: Response,
+    pe_service: PERatioService = Depends(get_pe_service)
+):
     """Get PE ratio for a specific stock symbol"""
-    return await pe_service.get_pe_ratio(symbol)
+    pe_ratio = await pe_service.get_pe_ratio(symbol)
+    
+    # The cached data only changes when it is re-fetched, so its fetch time identifies the version
+    etag = '"' + hashlib.md5(f"{pe_ratio.symbol}:{pe_ratio.last_updated.isoformat()}".encode()).hexdigest() + '"'
+    # Only let clients keep the data for as long as the cached entry has left to live
+    age = (datetime.now() - pe_ratio.last_updated).total_seconds()
+    max_age = max(0, int(CACHE_EXPIRY - age))
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return pe_ratio
 
 @app.get("/stock-info/{symbol}", response_model=StockInfoResponse)
-async def get_stock_info(symbol: str):
+async def get_stock_info(symbol: str, pe_service: PERatioService = Depends(get_pe_service)):
     """Get comprehensive stock information including PE ratio"""
     return await pe_service.get_stock_info(symbol)
 
+async def _bounded(coro, semaphore: asyncio.Semaphore):
+    """Await a coroutine while holding a semaphore slot"""
+    async with semaphore:
+        return await coro
+
+async def _stream_stock_info(
+    pe_service: PERatioService,
+    symbol_list: list[str],
+    semaphore: asyncio.Semaphore
+):
+    """Yield one NDJSON line per symbol, in completion order, as soon as its lookup finishes"""
+    async def lookup(symbol: str) -> StockInfoResponse:
+        try:
+            return await _bounded(pe_service.get_stock_info(symbol), semaphore)
+        except Exception as e:
+            return StockInfoResponse.model_construct(
+                symbol=symbol,
+                company_name=None,
+                pe_ratio=None,
+                price=None,
+                earnings_per_share=None,
+                market_cap=None,
+                last_updated=datetime.now(),
+                error=str(e)
+            )
+    
+    for next_result in asyncio.as_completed([lookup(symbol) for symbol in symbol_list]):
+        result = await next_result
+        yield orjson.dumps(result.model_dump()) + b"\n"
+
 @app.get("/pe-ratios/batch")
-async def get_multiple_pe_ratios(symbols: str):
-    """Get PE ratios for multiple stock symbols (comma-separated)"""
+async def get_multiple_pe_ratios(
+    symbols: str,
+    request: Request,
+    pe_service: PERatioService = Depends(get_pe_service)
+):
+    """
+    Get PE ratios for multiple stock symbols (comma-separated).
+    
+    Clients sending Accept: application/x-ndjson get one JSON object per line,
+    streamed as each symbol resolves, instead of a single {"symbols": [...]} body.
+    """
+    # Check the count before any per-symbol work so oversized input is rejected cheaply
+    if symbols.count(",") >= MAX_BATCH_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_SYMBOLS} symbols allowed per request")
+    
+    if not _SYMBOL_LIST_RE.fullmatch(symbols):
+        raise HTTPException(status_code=400, detail="Symbols must be a comma-separated list of ticker symbols")
+    
     symbol_list = [s.strip().upper() for s in symbols.split(",")]
     
-    if len(symbol_list) > 10:
-        raise HTTPException(status_code=400, detail="Maximum 10 symbols allowed per request")
+    semaphore = app.state.batch_semaphore
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_stock_info(pe_service, symbol_list, semaphore),
+            media_type="application/x-ndjson"
+        )
     
     results = []
-    tasks = [pe_service.get_stock_info(symbol) for symbol in symbol_list]
+    tasks = [_bounded(pe_service.get_stock_info(symbol), semaphore) for symbol in symbol_list]
     
     try:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Convert exceptions to error responses
         processed_results = []
+        completed_at = datetime.now()
         for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append(StockInfoResponse(
+            if isinstance(result, BaseException):
+                processed_results.append(StockInfoResponse.model_construct(
                     symbol=symbol_list[i],
                     company_name=None,
                     pe_ratio=None,
                     price=None,
                     earnings_per_share=None,
                     market_cap=None,
-                    last_updated=datetime.now(),
+                    last_updated=completed_at,
                     error=str(result)
                 ))
             else:
@@ -1,35 +1,31 @@
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import os
-import tempfile
+from sqlalchemy import event, text
+from sqlalchemy.engine.default import CACHE_HIT
 
-from app.main import app
-from app.database import get_db, Base
-from app.models.alert import Alert  # Import the model to ensure it's registered
+from app.database import engine
 
 
-def test_create_alert():
+# Plain rows for bulk seeding; never mutated, so shared by every test
+ALERTS_FIXTURE = (
+    {
+        "symbol": "AAPL",
+        "alert_type": "price",
+        "condition": "above",
+        "threshold_value": 150.0,
+        "message": "AAPL alert"
+    },
+    {
+        "symbol": "TSLA",
+        "alert_type": "volume",
+        "condition": "below",
+        "threshold_value": 1000000.0,
+        "message": "TSLA alert"
+    },
+)
+
+
+def test_create_alert(client):
     """Test creating a new alert via POST /api/alerts/"""
-    # Use in-memory SQLite for testing
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    
-    def override_get_db():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    client = TestClient(app)
-    
     # Test creating a valid alert
     alert_data = {
         "symbol": "AAPL",
@@ -62,80 +58,70 @@ def test_create_alert():
     
     response = client.post("/api/alerts/", json=invalid_alert)
     assert response.status_code == 422
-    
-    # Clean up
-    app.dependency_overrides.clear()
 
 
-def test_get_alerts():
-    """Test retrieving alerts via GET /api/alerts/"""
-    # Use in-memory SQLite for testing
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    
-    def override_get_db():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    client = TestClient(app)
-    
-    # Create test alerts
-    alert1 = {
-        "symbol": "AAPL",
-        "alert_type": "price",
-        "condition": "above",
-        "threshold_value": 150.0,
-        "message": "AAPL alert"
-    }
-    
-    alert2 = {
-        "symbol": "TSLA",
-        "alert_type": "volume",
-        "condition": "below",
-        "threshold_value": 1000000.0,
-        "message": "TSLA alert"
-    }
-    
-    # Create alerts
-    client.post("/api/alerts/", json=alert1)
-    client.post("/api/alerts/", json=alert2)
-    
-    # Get all alerts
-    response = client.get("/api/alerts/")
+@pytest.fixture
+def alert_seed_rows():
+    """Seed the shared seeded_alerts fixture with the canonical pair of alerts"""
+    return ALERTS_FIXTURE
+
+
+@pytest.mark.parametrize("url,total,check", [
+    ("/api/alerts/", 2, None),
+    ("/api/alerts/?symbol=AAPL", 1, lambda alert: alert["symbol"] == "AAPL"),
+    ("/api/alerts/?symbol=tsla", 1, lambda alert: alert["symbol"] == "TSLA"),
+    ("/api/alerts/?is_active=false", 0, None),
+])
+def test_get_alerts(client, seeded_alerts, url, total, check):
+    """Test retrieving and filtering alerts via GET /api/alerts/"""
+    response = client.get(url)
     assert response.status_code == 200
     
     data = response.json()
     assert "alerts" in data
     assert "total" in data
-    assert data["total"] == 2
-    assert len(data["alerts"]) == 2
-    
-    # Test filtering by symbol
-    response = client.get("/api/alerts/?symbol=AAPL")
-    assert response.status_code == 200
-    
-    data = response.json()
-    assert data["total"] == 1
-    assert data["alerts"][0]["symbol"] == "AAPL"
-    
-    # Clean up
-    app.dependency_overrides.clear()
+    assert data["total"] == total
+    assert len(data["alerts"]) == total
+    if check:
+        assert all(check(alert) for alert in data["alerts"])
+
+
+@pytest.mark.skipif(engine.dialect.name != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite syntax")
+def test_symbol_active_filter_uses_index(db_session):
+    """Test that filtering by symbol and active status is served by the composite index"""
+    plan = db_session.execute(
+        text("EXPLAIN QUERY PLAN SELECT * FROM alerts WHERE symbol = :symbol AND is_active = :active"),
+        {"symbol": "AAPL", "active": True}
+    ).all()
+    assert any("USING INDEX ix_alerts_symbol_active" in row.detail for row in plan)
+
 
+def test_alert_queries_reuse_compiled_sql(client, seeded_alerts):
+    """Test that repeated alert list and get queries are served from the compiled cache"""
+    urls = ["/api/alerts/?symbol=AAPL&is_active=true", f"/api/alerts/{seeded_alerts[0].id}"]
+    for url in urls:
+        assert client.get(url).status_code == 200
 
-def test_health_endpoints():
+    cache_hits = []
+
+    def record_cache_hit(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            cache_hits.append(context.cache_hit == CACHE_HIT)
+
+    event.listen(engine, "after_cursor_execute", record_cache_hit)
+    try:
+        for url in urls:
+            assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, "after_cursor_execute", record_cache_hit)
+
+    assert cache_hits and all(cache_hits)
+
+
+def test_health_endpoints(session_client):
     """Test health check endpoints"""
-    client = TestClient(app)
-    
     # Test root endpoint
-    response = client.get("/")
+    response = session_client.get("/")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "running"
@@ -143,7 +129,7 @@ def test_health_endpoints():
     assert "version" in data
     
     # Test health endpoint
-    response = client.get("/health")
+    response = session_client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
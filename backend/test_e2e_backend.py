@@ -6,109 +6,109 @@ including database operations, validation, error handling, and API workflows.
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 import json
+from collections import Counter, namedtuple
 from datetime import datetime
 from typing import Dict, Any
 
-# Import after setting up test environment to avoid PostgreSQL connection
-import os
-os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+from pydantic import ValidationError
+from sqlalchemy import delete
 
-from app.main import app
-from app.database import get_db, Base
 from app.models.alert import Alert
+from app.schemas.alert import AlertCreate
 
 
-class TestE2EBackend:
-    """Comprehensive E2E test suite for backend API functionality."""
-    
-    @pytest.fixture(scope="function")
-    def client(self):
-        """Create a test client with isolated in-memory database for each test."""
-        # Create in-memory SQLite database for testing
-        engine = create_engine(
-            "sqlite:///:memory:", 
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool
-        )
-        TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        
-        def override_get_db():
-            try:
-                db = TestingSessionLocal()
-                yield db
-            finally:
-                db.close()
-        
-        # Override the database dependency
-        app.dependency_overrides[get_db] = override_get_db
-        
-        # Create test client
-        with TestClient(app) as test_client:
-            yield test_client
-        
-        # Clean up
-        app.dependency_overrides.clear()
+SeedCounts = namedtuple("SeedCounts", ["count_by_symbol", "active_count"])
 
-    @pytest.fixture
-    def sample_alert_data(self) -> Dict[str, Any]:
-        """Sample alert data for testing."""
-        return {
+
+def make_alerts(n: int, symbols=("AAPL", "TSLA", "GOOGL", "MSFT")) -> list[Dict[str, Any]]:
+    """Build n alert payloads cycling through symbols, alternating active status."""
+    return [
+        {
+            "symbol": symbols[i % len(symbols)],
+            "alert_type": "price",
+            "condition": "above",
+            "threshold_value": float(100 + i),
+            "is_active": i % 2 == 0
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def sample_alert_data() -> Dict[str, Any]:
+    """Sample alert data for testing."""
+    return {
+        "symbol": "AAPL",
+        "alert_type": "price",
+        "condition": "above",
+        "threshold_value": 150.0,
+        "message": "AAPL price alert above $150",
+        "is_active": True
+    }
+
+
+@pytest.fixture
+def multiple_alerts_data() -> list[Dict[str, Any]]:
+    """Multiple alert data for testing filtering and pagination."""
+    return [
+        {
             "symbol": "AAPL",
             "alert_type": "price",
             "condition": "above",
             "threshold_value": 150.0,
-            "message": "AAPL price alert above $150",
+            "message": "AAPL price alert",
+            "is_active": True
+        },
+        {
+            "symbol": "TSLA",
+            "alert_type": "volume",
+            "condition": "below",
+            "threshold_value": 1000000.0,
+            "message": "TSLA volume alert",
+            "is_active": True
+        },
+        {
+            "symbol": "GOOGL",
+            "alert_type": "price",
+            "condition": "below",
+            "threshold_value": 120.0,
+            "message": "GOOGL price alert",
+            "is_active": False
+        },
+        {
+            "symbol": "AAPL",
+            "alert_type": "news",
+            "condition": "equals",
+            "threshold_value": None,
+            "message": "AAPL news alert",
             "is_active": True
         }
+    ]
+
+
+@pytest.fixture
+def seed_counts(multiple_alerts_data) -> SeedCounts:
+    """Expected filter totals for multiple_alerts_data."""
+    return SeedCounts(
+        count_by_symbol=Counter(alert["symbol"] for alert in multiple_alerts_data),
+        active_count=sum(alert["is_active"] for alert in multiple_alerts_data)
+    )
+
+
+@pytest.fixture
+def alert_seed_rows(multiple_alerts_data) -> list[Dict[str, Any]]:
+    """Seed the shared seeded_alerts fixture with multiple_alerts_data."""
+    return multiple_alerts_data
 
-    @pytest.fixture
-    def multiple_alerts_data(self) -> list[Dict[str, Any]]:
-        """Multiple alert data for testing filtering and pagination."""
-        return [
-            {
-                "symbol": "AAPL",
-                "alert_type": "price",
-                "condition": "above",
-                "threshold_value": 150.0,
-                "message": "AAPL price alert",
-                "is_active": True
-            },
-            {
-                "symbol": "TSLA",
-                "alert_type": "volume",
-                "condition": "below",
-                "threshold_value": 1000000.0,
-                "message": "TSLA volume alert",
-                "is_active": True
-            },
-            {
-                "symbol": "GOOGL",
-                "alert_type": "price",
-                "condition": "below",
-                "threshold_value": 120.0,
-                "message": "GOOGL price alert",
-                "is_active": False
-            },
-            {
-                "symbol": "AAPL",
-                "alert_type": "news",
-                "condition": "equals",
-                "threshold_value": None,
-                "message": "AAPL news alert",
-                "is_active": True
-            }
-        ]
-
-
-class TestHealthEndpoints(TestE2EBackend):
+
+@pytest.fixture
+def seeded_client(client, seeded_alerts):
+    """Test client backed by a database seeded with multiple_alerts_data."""
+    return client
+
+
+class TestHealthEndpoints:
     """Test health check and basic endpoints."""
     
     def test_root_endpoint(self, client):
@@ -130,23 +130,19 @@ class TestHealthEndpoints(TestE2EBackend):
         data = response.json()
         assert data["status"] == "healthy"
 
-    def test_api_documentation(self, client):
-        """Test that API documentation endpoints are accessible."""
-        # Test OpenAPI JSON
-        response = client.get("/openapi.json")
-        assert response.status_code == 200
-        
-        openapi_data = response.json()
-        assert "openapi" in openapi_data
-        assert "paths" in openapi_data
-        assert "/api/alerts/" in openapi_data["paths"]
-        
-        # Test Swagger UI accessibility
-        response = client.get("/docs")
+    def test_api_documentation(self, openapi_schema):
+        """Test that the OpenAPI schema describes the alert endpoints."""
+        assert "openapi" in openapi_schema
+        assert "paths" in openapi_schema
+        assert "/api/alerts/" in openapi_schema["paths"]
+
+    def test_swagger_ui(self, session_client):
+        """Test that Swagger UI is accessible."""
+        response = session_client.get("/docs")
         assert response.status_code == 200
 
 
-class TestAlertCreation(TestE2EBackend):
+class TestAlertCreation:
     """Test alert creation scenarios."""
     
     def test_create_valid_alert(self, client, sample_alert_data):
@@ -197,24 +193,27 @@ class TestAlertCreation(TestE2EBackend):
         assert data["message"] is None
         assert data["is_active"] is True  # Default value
 
-    def test_create_alert_validation_errors(self, client):
+    @pytest.mark.parametrize("invalid_data", [
+        # Missing required fields
+        {},
+        {"symbol": "AAPL"},
+        {"symbol": "AAPL", "alert_type": "price"},
+
+        # Invalid field values
+        {"symbol": "", "alert_type": "price", "condition": "above"},
+        {"symbol": "TOOLONGSYMBOL", "alert_type": "price", "condition": "above"},
+        {"symbol": "AAPL", "alert_type": "", "condition": "above"},
+        {"symbol": "AAPL", "alert_type": "price", "condition": ""},
+    ])
+    def test_create_alert_validation_errors(self, invalid_data):
         """Test validation errors for invalid alert data."""
-        test_cases = [
-            # Missing required fields
-            ({}, 422),
-            ({"symbol": "AAPL"}, 422),
-            ({"symbol": "AAPL", "alert_type": "price"}, 422),
-            
-            # Invalid field values
-            ({"symbol": "", "alert_type": "price", "condition": "above"}, 422),
-            ({"symbol": "TOOLONGSYMBOL", "alert_type": "price", "condition": "above"}, 422),
-            ({"symbol": "AAPL", "alert_type": "", "condition": "above"}, 422),
-            ({"symbol": "AAPL", "alert_type": "price", "condition": ""}, 422),
-        ]
-        
-        for invalid_data, expected_status in test_cases:
-            response = client.post("/api/alerts/", json=invalid_data)
-            assert response.status_code == expected_status
+        with pytest.raises(ValidationError):
+            AlertCreate(**invalid_data)
+
+    def test_create_alert_validation_error_response(self, client):
+        """Test that invalid alert data is rejected with 422 over HTTP."""
+        response = client.post("/api/alerts/", json={"symbol": "AAPL"})
+        assert response.status_code == 422
 
     def test_create_multiple_alerts(self, client, multiple_alerts_data):
         """Test creating multiple alerts to verify database persistence."""
@@ -237,7 +236,7 @@ class TestAlertCreation(TestE2EBackend):
         assert data["total"] == len(multiple_alerts_data)
 
 
-class TestAlertRetrieval(TestE2EBackend):
+class TestAlertRetrieval:
     """Test alert retrieval and filtering scenarios."""
     
     def test_get_empty_alerts_list(self, client):
@@ -251,13 +250,9 @@ class TestAlertRetrieval(TestE2EBackend):
         assert data["page"] == 1
         assert data["page_size"] == 100
 
-    def test_get_alerts_with_data(self, client, multiple_alerts_data):
+    def test_get_alerts_with_data(self, seeded_client, multiple_alerts_data):
         """Test retrieving alerts when data exists."""
-        # Create test alerts
-        for alert_data in multiple_alerts_data:
-            client.post("/api/alerts/", json=alert_data)
-        
-        response = client.get("/api/alerts/")
+        response = seeded_client.get("/api/alerts/")
         assert response.status_code == 200
         
         data = response.json()
@@ -270,6 +265,7 @@ class TestAlertRetrieval(TestE2EBackend):
         """Test retrieving a specific alert by ID."""
         # Create an alert
         create_response = client.post("/api/alerts/", json=sample_alert_data)
+        create_response.raise_for_status()
         created_alert = create_response.json()
         alert_id = created_alert["id"]
         
@@ -289,48 +285,34 @@ class TestAlertRetrieval(TestE2EBackend):
         data = response.json()
         assert "not found" in data["detail"].lower()
 
-    def test_filter_alerts_by_symbol(self, client, multiple_alerts_data):
+    def test_filter_alerts_by_symbol(self, seeded_client, seed_counts):
         """Test filtering alerts by stock symbol."""
-        # Create test alerts
-        for alert_data in multiple_alerts_data:
-            client.post("/api/alerts/", json=alert_data)
-        
         # Filter by AAPL
-        response = client.get("/api/alerts/?symbol=AAPL")
+        response = seeded_client.get("/api/alerts/?symbol=AAPL")
         assert response.status_code == 200
         
         data = response.json()
-        aapl_alerts = [alert for alert in multiple_alerts_data if alert["symbol"] == "AAPL"]
-        assert data["total"] == len(aapl_alerts)
+        assert data["total"] == seed_counts.count_by_symbol["AAPL"]
         
         for alert in data["alerts"]:
             assert alert["symbol"] == "AAPL"
 
-    def test_filter_alerts_by_active_status(self, client, multiple_alerts_data):
+    def test_filter_alerts_by_active_status(self, seeded_client, seed_counts):
         """Test filtering alerts by active status."""
-        # Create test alerts
-        for alert_data in multiple_alerts_data:
-            client.post("/api/alerts/", json=alert_data)
-        
         # Filter by active status
-        response = client.get("/api/alerts/?is_active=true")
+        response = seeded_client.get("/api/alerts/?is_active=true")
         assert response.status_code == 200
         
         data = response.json()
-        active_alerts = [alert for alert in multiple_alerts_data if alert["is_active"]]
-        assert data["total"] == len(active_alerts)
+        assert data["total"] == seed_counts.active_count
         
         for alert in data["alerts"]:
             assert alert["is_active"] is True
 
-    def test_pagination(self, client, multiple_alerts_data):
+    def test_pagination(self, seeded_client, multiple_alerts_data):
         """Test pagination functionality."""
-        # Create test alerts
-        for alert_data in multiple_alerts_data:
-            client.post("/api/alerts/", json=alert_data)
-        
         # Test pagination with limit
-        response = client.get("/api/alerts/?limit=2")
+        response = seeded_client.get("/api/alerts/?limit=2")
         assert response.status_code == 200
         
         data = response.json()
@@ -339,21 +321,58 @@ class TestAlertRetrieval(TestE2EBackend):
         assert data["page_size"] == 2
         
         # Test pagination with skip
-        response = client.get("/api/alerts/?skip=2&limit=2")
+        response = seeded_client.get("/api/alerts/?skip=2&limit=2")
         assert response.status_code == 200
         
         data = response.json()
         assert len(data["alerts"]) <= 2
         assert data["total"] == len(multiple_alerts_data)
 
+    @pytest.mark.parametrize("alert_seed_rows", [make_alerts(n) for n in (4, 100, 1000)], ids=["4", "100", "1000"])
+    def test_pagination_boundaries(self, client, seeded_alerts):
+        """Test first, last and past-the-end pages over different table sizes."""
+        n = len(seeded_alerts)
+        limit = 10
+        last_skip = (n - 1) // limit * limit
+
+        response = client.get(f"/api/alerts/?limit={limit}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["alerts"]) == min(n, limit)
+        assert data["total"] == n
+        assert data["page"] == 1
+
+        response = client.get(f"/api/alerts/?skip={last_skip}&limit={limit}")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["alerts"]) == n - last_skip
+        assert data["total"] == n
+        assert data["page"] == last_skip // limit + 1
+
+        response = client.get(f"/api/alerts/?skip={last_skip + limit}&limit={limit}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["alerts"] == []
+        assert data["total"] == n
+
+    def test_pagination_past_end(self, seeded_client, multiple_alerts_data):
+        """Test that total is still reported when the page is empty."""
+        response = seeded_client.get("/api/alerts/?skip=10&limit=2")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["alerts"] == []
+        assert data["total"] == len(multiple_alerts_data)
+
 
-class TestAlertUpdate(TestE2EBackend):
+class TestAlertUpdate:
     """Test alert update scenarios."""
     
     def test_update_alert_full(self, client, sample_alert_data):
         """Test updating all fields of an alert."""
         # Create an alert
         create_response = client.post("/api/alerts/", json=sample_alert_data)
+        create_response.raise_for_status()
         alert_id = create_response.json()["id"]
         
         # Update the alert
@@ -382,6 +401,7 @@ class TestAlertUpdate(TestE2EBackend):
         """Test updating only some fields of an alert."""
         # Create an alert
         create_response = client.post("/api/alerts/", json=sample_alert_data)
+        create_response.raise_for_status()
         created_alert = create_response.json()
         alert_id = created_alert["id"]
         
@@ -421,6 +441,7 @@ class TestAlertUpdate(TestE2EBackend):
         """Test that symbol is normalized during update."""
         # Create an alert
         create_response = client.post("/api/alerts/", json=sample_alert_data)
+        create_response.raise_for_status()
         alert_id = create_response.json()["id"]
         
         # Update with lowercase symbol
@@ -433,13 +454,14 @@ class TestAlertUpdate(TestE2EBackend):
         assert updated_alert["symbol"] == "MSFT"
 
 
-class TestAlertDeletion(TestE2EBackend):
+class TestAlertDeletion:
     """Test alert deletion scenarios."""
     
     def test_delete_alert(self, client, sample_alert_data):
         """Test deleting an existing alert."""
         # Create an alert
         create_response = client.post("/api/alerts/", json=sample_alert_data)
+        create_response.raise_for_status()
         alert_id = create_response.json()["id"]
         
         # Delete the alert
@@ -459,30 +481,26 @@ class TestAlertDeletion(TestE2EBackend):
         data = response.json()
         assert "not found" in data["detail"].lower()
 
-    def test_delete_alert_persistence(self, client, multiple_alerts_data):
+    def test_delete_alert_persistence(self, seeded_client, seeded_alerts, multiple_alerts_data):
         """Test that deleting one alert doesn't affect others."""
-        # Create multiple alerts
-        created_ids = []
-        for alert_data in multiple_alerts_data:
-            response = client.post("/api/alerts/", json=alert_data)
-            created_ids.append(response.json()["id"])
+        created_ids = [alert.id for alert in seeded_alerts]
         
         # Delete the first alert
-        response = client.delete(f"/api/alerts/{created_ids[0]}")
+        response = seeded_client.delete(f"/api/alerts/{created_ids[0]}")
         assert response.status_code == 204
         
         # Verify other alerts still exist
         for alert_id in created_ids[1:]:
-            response = client.get(f"/api/alerts/{alert_id}")
+            response = seeded_client.get(f"/api/alerts/{alert_id}")
             assert response.status_code == 200
         
         # Verify total count is reduced
-        response = client.get("/api/alerts/")
+        response = seeded_client.get("/api/alerts/")
         data = response.json()
         assert data["total"] == len(multiple_alerts_data) - 1
 
 
-class TestErrorHandling(TestE2EBackend):
+class TestErrorHandling:
     """Test error handling and edge cases."""
     
     def test_invalid_json_request(self, client):
@@ -542,7 +560,7 @@ class TestErrorHandling(TestE2EBackend):
         assert data["message"] == alert_data["message"]
 
 
-class TestCompleteWorkflow(TestE2EBackend):
+class TestCompleteWorkflow:
     """Test complete E2E workflows."""
     
     def test_complete_alert_lifecycle(self, client, sample_alert_data):
@@ -584,49 +602,41 @@ class TestCompleteWorkflow(TestE2EBackend):
         final_read_response = client.get(f"/api/alerts/{alert_id}")
         assert final_read_response.status_code == 404
 
-    def test_bulk_operations_workflow(self, client, multiple_alerts_data):
+    def test_bulk_operations_workflow(self, seeded_client, seeded_alerts, seed_counts, db_session):
         """Test bulk operations workflow."""
-        # Create multiple alerts
-        created_ids = []
-        for alert_data in multiple_alerts_data:
-            response = client.post("/api/alerts/", json=alert_data)
-            assert response.status_code == 201
-            created_ids.append(response.json()["id"])
+        created_ids = [alert.id for alert in seeded_alerts]
         
         # Test filtering and pagination
-        aapl_response = client.get("/api/alerts/?symbol=AAPL")
+        aapl_response = seeded_client.get("/api/alerts/?symbol=AAPL")
         assert aapl_response.status_code == 200
         aapl_data = aapl_response.json()
-        aapl_count = len([a for a in multiple_alerts_data if a["symbol"] == "AAPL"])
-        assert aapl_data["total"] == aapl_count
+        assert aapl_data["total"] == seed_counts.count_by_symbol["AAPL"]
         
         # Test active filter
-        active_response = client.get("/api/alerts/?is_active=true")
+        active_response = seeded_client.get("/api/alerts/?is_active=true")
         assert active_response.status_code == 200
         active_data = active_response.json()
-        active_count = len([a for a in multiple_alerts_data if a["is_active"]])
-        assert active_data["total"] == active_count
+        assert active_data["total"] == seed_counts.active_count
         
         # Update multiple alerts
         for alert_id in created_ids[:2]:
-            update_response = client.put(
+            update_response = seeded_client.put(
                 f"/api/alerts/{alert_id}",
                 json={"is_active": False}
             )
             assert update_response.status_code == 200
         
         # Verify updates
-        updated_active_response = client.get("/api/alerts/?is_active=true")
+        updated_active_response = seeded_client.get("/api/alerts/?is_active=true")
         updated_active_data = updated_active_response.json()
-        assert updated_active_data["total"] == active_count - 2
+        assert updated_active_data["total"] == seed_counts.active_count - 2
         
-        # Clean up by deleting all
-        for alert_id in created_ids:
-            delete_response = client.delete(f"/api/alerts/{alert_id}")
-            assert delete_response.status_code == 204
+        # Clean up by deleting all in one statement
+        db_session.execute(delete(Alert).where(Alert.id.in_(created_ids)))
+        db_session.commit()
         
         # Verify all deleted
-        final_response = client.get("/api/alerts/")
+        final_response = seeded_client.get("/api/alerts/")
         final_data = final_response.json()
         assert final_data["total"] == 0
 
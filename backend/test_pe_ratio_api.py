@@ -0,0 +1,241 @@
+"""
+Tests for the PE Ratio API (main.py).
+
+Alpha Vantage is replaced by an httpx.MockTransport, and the PERatioService built
+on it is injected through the get_pe_service dependency.
+"""
+
+import asyncio
+from datetime import timedelta
+
+import httpx
+import orjson
+import pytest
+import redis.asyncio as redis
+from fastapi.testclient import TestClient
+
+import main
+
+
+OVERVIEW = {
+    "Name": "Apple Inc",
+    "PERatio": "28.5",
+    "AnalystTargetPrice": "190.10",
+    "EPS": "6.42",
+    "MarketCapitalization": "2950000000000"
+}
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands PERatioService uses."""
+
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+
+    async def get(self, key: str):
+        return self.store.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int = None):
+        self.store[key] = value
+
+
+@pytest.fixture
+def upstream_calls() -> list[str]:
+    """Symbols requested from the mocked Alpha Vantage API, in order."""
+    return []
+
+
+@pytest.fixture
+def pe_service(monkeypatch, upstream_calls) -> main.PERatioService:
+    """PERatioService backed by a mocked Alpha Vantage API and an empty cache."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        symbol = request.url.params["symbol"]
+        upstream_calls.append(symbol)
+        # Keep the request in flight long enough for concurrent callers to pile up
+        await asyncio.sleep(0.01)
+        if symbol == "BAD":
+            return httpx.Response(200, json={"Error Message": "Invalid API call"})
+        return httpx.Response(200, json={"Symbol": symbol, **OVERVIEW})
+
+    monkeypatch.setattr(main, "ALPHA_VANTAGE_API_KEY", "test")
+    main.pe_ratio_cache.clear()
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url=main.ALPHA_VANTAGE_BASE_URL
+    )
+    yield main.PERatioService(client)
+    asyncio.run(client.aclose())
+    main.pe_ratio_cache.clear()
+
+
+@pytest.fixture
+def pe_client(pe_service):
+    """TestClient for the PE ratio app with the mocked service injected."""
+    main.app.dependency_overrides[main.get_pe_service] = lambda: pe_service
+    with TestClient(main.app) as test_client:
+        yield test_client
+    main.app.dependency_overrides.pop(main.get_pe_service, None)
+
+
+class TestPERatioETag:
+    """Test conditional requests on /pe-ratio/{symbol}."""
+
+    def test_not_modified_round_trip(self, pe_client, upstream_calls):
+        """Test that a matching If-None-Match gets an empty 304 from cache."""
+        response = pe_client.get("/pe-ratio/aapl")
+        assert response.status_code == 200
+        assert response.json()["pe_ratio"] == 28.5
+        etag = response.headers["etag"]
+        assert 0 < int(response.headers["cache-control"].removeprefix("max-age=")) <= main.CACHE_EXPIRY
+
+        response = pe_client.get("/pe-ratio/AAPL", headers={"If-None-Match": f'"other", {etag}'})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert upstream_calls == ["AAPL"]
+
+    def test_stale_etag_gets_full_response(self, pe_client):
+        """Test that a non-matching If-None-Match gets the full body."""
+        response = pe_client.get("/pe-ratio/aapl", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+        assert response.json()["symbol"] == "AAPL"
+
+    def test_max_age_counts_down_with_cache_entry_age(self, pe_client):
+        """Test that max-age is the cached entry's remaining lifetime, not the full TTL."""
+        pe_client.get("/pe-ratio/aapl")
+        main.pe_ratio_cache["AAPL"]["last_updated"] -= timedelta(seconds=main.CACHE_EXPIRY - 60)
+
+        response = pe_client.get("/pe-ratio/aapl")
+        max_age = int(response.headers["cache-control"].removeprefix("max-age="))
+        assert 0 <= max_age <= 60
+
+        main.pe_ratio_cache["AAPL"]["last_updated"] -= timedelta(seconds=120)
+        response = pe_client.get("/pe-ratio/aapl")
+        assert response.headers["cache-control"] == "max-age=0"
+
+
+class TestBatchValidation:
+    """Test symbol list validation on /pe-ratios/batch."""
+
+    @pytest.mark.parametrize("symbols", [
+        "AAPL",
+        "aapl, msft",
+        "BRK.B,BF-B",
+        ",".join(f"S{i}" for i in range(main.MAX_BATCH_SYMBOLS)),
+    ])
+    def test_accepted_symbol_lists(self, pe_client, symbols):
+        """Test that well-formed lists of up to MAX_BATCH_SYMBOLS are served."""
+        response = pe_client.get("/pe-ratios/batch", params={"symbols": symbols})
+        assert response.status_code == 200
+        assert len(response.json()["symbols"]) == len(symbols.split(","))
+
+    @pytest.mark.parametrize("symbols", [
+        "",
+        "AAPL,",
+        ",AAPL",
+        "AAPL,,MSFT",
+        "^GSPC",
+        "TOOLONGSYMBOL",
+    ])
+    def test_rejected_symbol_lists(self, pe_client, upstream_calls, symbols):
+        """Test that malformed lists are rejected before any upstream call."""
+        response = pe_client.get("/pe-ratios/batch", params={"symbols": symbols})
+        assert response.status_code == 400
+        assert upstream_calls == []
+
+    def test_too_many_symbols(self, pe_client, upstream_calls):
+        """Test that more than MAX_BATCH_SYMBOLS symbols are rejected."""
+        symbols = ",".join(f"S{i}" for i in range(main.MAX_BATCH_SYMBOLS + 1))
+        response = pe_client.get("/pe-ratios/batch", params={"symbols": symbols})
+        assert response.status_code == 400
+        assert f"Maximum {main.MAX_BATCH_SYMBOLS}" in response.json()["detail"]
+        assert upstream_calls == []
+
+
+class TestBatchStreaming:
+    """Test NDJSON responses from /pe-ratios/batch."""
+
+    def test_ndjson_one_line_per_symbol(self, pe_client):
+        """Test that each symbol, including failures, is streamed as its own line."""
+        response = pe_client.get(
+            "/pe-ratios/batch",
+            params={"symbols": "AAPL,MSFT,BAD"},
+            headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [orjson.loads(line) for line in response.content.splitlines()]
+        assert len(lines) == 3
+        assert {line["symbol"] for line in lines} == {"AAPL", "MSFT", "BAD"}
+        errors = {line["symbol"]: line["error"] for line in lines}
+        assert errors["AAPL"] is None
+        assert "not found" in errors["BAD"]
+
+
+class TestOverviewCoalescing:
+    """Test that concurrent cache misses share one upstream fetch."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self, pe_service, upstream_calls):
+        """Test that N concurrent lookups of one symbol make a single upstream call."""
+        results = await asyncio.gather(*[pe_service.get_stock_info("aapl") for _ in range(20)])
+        assert upstream_calls == ["AAPL"]
+        assert all(result.pe_ratio == 28.5 for result in results)
+
+    @pytest.mark.asyncio
+    async def test_error_fans_out_to_every_waiter(self, pe_service, upstream_calls):
+        """Test that an upstream error reaches every concurrent caller."""
+        results = await asyncio.gather(*[pe_service.get_stock_info("BAD") for _ in range(5)])
+        assert upstream_calls == ["BAD"]
+        assert all("not found" in result.error for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_first_caller_does_not_fail_others(self, pe_service, upstream_calls):
+        """Test that cancelling the caller that started a fetch leaves other waiters intact."""
+        first = asyncio.create_task(pe_service.get_stock_info("AAPL"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(pe_service.get_stock_info("AAPL"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        result = await second
+        assert result.error is None
+        assert result.pe_ratio == 28.5
+        assert upstream_calls == ["AAPL"]
+
+
+class TestSharedCacheFallback:
+    """Test behaviour when the Redis shared cache is unavailable."""
+
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_falls_back_to_upstream(self, pe_service, upstream_calls):
+        """Test that Redis errors are treated as cache misses rather than failures."""
+        # Nothing listens on port 1, so every Redis command fails to connect
+        pe_service.redis = redis.from_url("redis://127.0.0.1:1", socket_connect_timeout=1)
+
+        result = await pe_service.get_pe_ratio("AAPL")
+        assert result.pe_ratio == 28.5
+        assert upstream_calls == ["AAPL"]
+
+        # The in-process cache still serves repeat lookups
+        await pe_service.get_pe_ratio("AAPL")
+        assert upstream_calls == ["AAPL"]
+        await pe_service.redis.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_hit_skips_upstream(self, pe_service, upstream_calls):
+        """Test that an entry stored by another worker is served without an upstream call."""
+        pe_service.redis = FakeRedis()
+
+        first = await pe_service.get_pe_ratio("AAPL")
+        assert upstream_calls == ["AAPL"]
+        assert "pe:AAPL" in pe_service.redis.store
+
+        # Simulate another worker: empty in-process cache, same Redis
+        main.pe_ratio_cache.clear()
+        second = await pe_service.get_pe_ratio("AAPL")
+        assert upstream_calls == ["AAPL"]
+        assert second.pe_ratio == first.pe_ratio
+        assert second.last_updated == first.last_updated
+